@@ -1,18 +1,31 @@
 # Standard library imports
 import os
+import io
+import re
+import csv
 import json
 import logging
+import threading
+import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from collections import defaultdict
 
 # Third-party imports
+import numpy as np
+import orjson
 import pandas as pd
 import sqlalchemy as sa
+import pyarrow as pa
+from pyarrow import csv as pacsv
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Body
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import create_engine, MetaData, Table, Column, String, Integer, Float, Text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 import strawberry
 from strawberry.fastapi import GraphQLRouter
@@ -21,10 +34,24 @@ from strawberry.fastapi import GraphQLRouter
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# JSON encoding: column names may be str subclasses, CSV values may be NumPy scalars,
+# and anything orjson can't encode natively (e.g. Decimal) falls back to FastAPI's encoder
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def dump_json(content: Any) -> bytes:
+    """Serialize content to JSON with orjson"""
+    return orjson.dumps(content, default=jsonable_encoder, option=ORJSON_OPTIONS)
+
+class APIResponse(ORJSONResponse):
+    """orjson response using dump_json; returned directly it skips jsonable_encoder"""
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="API Anywhere Converter",
     description="Auto-generate REST and GraphQL APIs from databases and CSV files",
+    default_response_class=APIResponse,
     version="1.0.0"
 )
 
@@ -39,9 +66,33 @@ app.add_middleware(
 
 # Global variables
 db_engines = {}
+db_engines_lock = threading.Lock()  # Serialize first-time engine creation per URL
+table_cache = {}  # Reflected Table objects keyed by (engine id, table name)
+metadata_cache = {}  # (reflected at, MetaData) for whole databases keyed by engine id
 csv_tables = {}
 csv_next_ids = defaultdict(int)  # Track next ID for CSV records
+csv_locks = defaultdict(threading.Lock)  # Serialize reads and mutations per CSV table
 default_db_url = os.getenv("DB_URL")  # Get default DB URL from environment
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))  # Persistent connections per engine
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))  # Extra connections allowed under burst load
+DB_POOL_TIMEOUT = 30  # Seconds to wait for a free pooled connection
+DB_POOL_RECYCLE = 1800  # Seconds before a pooled connection is replaced
+DB_STREAM_BATCH_SIZE = 1000  # Rows fetched per round trip when streaming table data
+METADATA_CACHE_TTL = 60  # Seconds a reflected database schema is reused
+SMALL_CSV_SIZE = 1 << 20  # Uploads up to this many bytes are parsed with the stdlib csv module
+CSV_BLOCK_SIZE = 8 << 20  # Bytes per block handed to pyarrow's CSV parser threads
+
+# Type inference for small CSV uploads, kept in line with pyarrow's defaults so a
+# file's column types don't depend on which parser its size selects. Timestamps,
+# dates and times stay text on both paths (see read_large_csv); the one remaining
+# difference is padded numbers like " 7 ", which pyarrow trims and parses but
+# this path keeps as strings
+CSV_NULL_VALUES = frozenset(pacsv.ConvertOptions().null_values)
+CSV_BOOL_VALUES = {
+    **dict.fromkeys(pacsv.ConvertOptions().true_values, True),
+    **dict.fromkeys(pacsv.ConvertOptions().false_values, False),
+}
+CSV_INT_PATTERN = re.compile(r"-?[0-9]+")
 
 # Pydantic models
 class DatabaseConnection(BaseModel):
@@ -58,54 +109,278 @@ class RecordData(BaseModel):
 
 def get_db_engine(db_url: str):
     """Get or create database engine"""
-    if db_url not in db_engines:
+    # Fast path: engines are never removed, so a cached one can be returned without locking
+    engine = db_engines.get(db_url)
+    if engine is not None:
+        return engine
+    
+    with db_engines_lock:
+        if db_url not in db_engines:
+            try:
+                pool_options = {"pool_pre_ping": True, "pool_recycle": DB_POOL_RECYCLE}
+                # SQLite picks its own pool class, which does not accept QueuePool sizing
+                if make_url(db_url).get_backend_name() != "sqlite":
+                    pool_options.update(
+                        poolclass=QueuePool,
+                        pool_size=DB_POOL_SIZE,
+                        max_overflow=DB_MAX_OVERFLOW,
+                        pool_timeout=DB_POOL_TIMEOUT
+                    )
+                engine = create_engine(db_url, **pool_options)
+                db_engines[db_url] = engine
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Invalid database URL: {str(e)}")
+        
+        return db_engines[db_url]
+
+def get_table_schema(engine, table_name: str):
+    """Get table schema from database, reflecting it only on first use"""
+    cache_key = (id(engine), table_name)
+    table = table_cache.get(cache_key)
+    if table is None:
+        metadata = MetaData()
         try:
-            engine = create_engine(db_url)
-            db_engines[db_url] = engine
+            table = Table(table_name, metadata, autoload_with=engine)
         except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid database URL: {str(e)}")
+            raise HTTPException(status_code=404, detail=f"Table {table_name} not found: {str(e)}")
+        table_cache[cache_key] = table
     
-    return db_engines[db_url]
+    return table
 
-def get_table_schema(engine, table_name: str):
-    """Get table schema from database"""
+def get_table_statements(table):
+    """Build a table's parameterized CRUD statements once and keep them on the Table"""
+    statements = table.info.get("statements")
+    if statements is None:
+        record_id = sa.bindparam("_record_id")
+        statements = {
+            "get_by_id": sa.select(table).where(table.c.id == record_id),
+            "insert": table.insert(),
+            "update": table.update().where(table.c.id == record_id),
+            "delete": table.delete().where(table.c.id == record_id)
+        }
+        table.info["statements"] = statements
+    
+    return statements
+
+def check_record_columns(table, data: Dict[str, Any]):
+    """Reject record fields that are not columns of the table"""
+    # The cached insert/update statements would silently drop unknown keys
+    unknown = data.keys() - table.c.keys()
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+
+def get_database_metadata(engine):
+    """Reflect all tables in a database, reusing the result for METADATA_CACHE_TTL seconds"""
+    cached = metadata_cache.get(id(engine))
+    now = time.monotonic()
+    if cached and now - cached[0] < METADATA_CACHE_TTL:
+        return cached[1]
+    
     metadata = MetaData()
-    try:
-        table = Table(table_name, metadata, autoload_with=engine)
-        return table
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Table {table_name} not found: {str(e)}")
+    metadata.reflect(bind=engine)
+    metadata_cache[id(engine)] = (now, metadata)
+    
+    # Reflected tables also serve per-table schema lookups
+    for table_name, table in metadata.tables.items():
+        table_cache[(id(engine), table_name)] = table
+    
+    return metadata
+
+def clear_table_cache(engine):
+    """Drop cached table schemas for an engine so they are reflected again"""
+    metadata_cache.pop(id(engine), None)
+    for cache_key in list(table_cache):
+        if cache_key[0] == id(engine):
+            table_cache.pop(cache_key, None)
 
-def create_csv_table(table_name: str, data: List[Dict[str, Any]]):
+def create_csv_table(table_name: str, df: pd.DataFrame):
     """Create a virtual table from CSV data"""
-    if not data:
+    if df.empty:
         raise HTTPException(status_code=400, detail="No data provided")
     
-    # Add ID column to each record if not present
-    for i, record in enumerate(data):
-        if 'id' not in record:
-            record['id'] = i + 1
-    
-    # Store CSV data in memory
-    csv_tables[table_name] = {
-        "data": data,
-        "columns": list(data[0].keys()) if data else [],
-        "row_count": len(data)
-    }
+    # Add ID column if not present
+    if 'id' not in df.columns:
+        df.insert(0, 'id', np.arange(1, len(df) + 1))
     
-    # Set next ID for this table
-    csv_next_ids[table_name] = len(data) + 1
+    # Store CSV data in memory as a columnar DataFrame indexed by id for O(1) lookups;
+    # assigning the index in place avoids the full copy set_index() makes
+    df.index = pd.Index(df['id'].to_numpy())
+    with csv_locks[table_name]:
+        csv_tables[table_name] = {
+            "df": df,
+            "columns": df.columns.tolist(),
+            "row_count": len(df)
+        }
+        
+        # Set next ID for this table past the highest existing one, so uploads
+        # with gaps in their ids never hand out an id that is already taken
+        max_id = pd.to_numeric(df['id'], errors='coerce').max()
+        csv_next_ids[table_name] = int(max_id) + 1 if pd.notna(max_id) else len(df) + 1
     
     return table_name
 
+def dedupe_csv_header(header: List[str]) -> List[str]:
+    """Rename repeated CSV column names the way pandas does (a, a.1, a.2, ...)"""
+    seen = set()
+    repeats = defaultdict(int)
+    names = []
+    for name in header:
+        unique_name = name
+        while unique_name in seen:
+            repeats[name] += 1
+            unique_name = f"{name}.{repeats[name]}"
+        seen.add(unique_name)
+        names.append(unique_name)
+    
+    return names
+
+def parse_csv_int(value: str) -> int:
+    """Parse a CSV value as int64 the way pyarrow infers it"""
+    if not CSV_INT_PATTERN.fullmatch(value):
+        raise ValueError(value)
+    number = int(value)
+    if not -(1 << 63) <= number < (1 << 63):
+        raise ValueError(value)
+    return number
+
+def parse_csv_bool(value: str) -> bool:
+    """Parse a CSV value as a boolean the way pyarrow infers it"""
+    if value not in CSV_BOOL_VALUES:
+        raise ValueError(value)
+    return CSV_BOOL_VALUES[value]
+
+def parse_csv_float(value: str) -> float:
+    """Parse a CSV value as a float, rejecting Python-only spellings like 1_000 or padding"""
+    if "_" in value or value != value.strip():
+        raise ValueError(value)
+    return float(value)
+
+def convert_csv_column(values):
+    """Infer a column of CSV strings as int, bool, float or string, in pyarrow's order"""
+    values = [None if value in CSV_NULL_VALUES else value for value in values]
+    for parse in (parse_csv_int, parse_csv_bool, parse_csv_float):
+        try:
+            return [parse(value) if value is not None else None for value in values]
+        except ValueError:
+            continue
+    
+    return values
+
+def read_small_csv(file) -> pd.DataFrame:
+    """Parse a small CSV upload with the stdlib csv module"""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = dedupe_csv_header(next(reader, []))
+        rows = []
+        for line_number, row in enumerate(reader, start=2):
+            # Blank lines are skipped, as pyarrow and pandas do
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError(f"Expected {len(header)} fields in line {line_number}, saw {len(row)}")
+            rows.append(row)
+    finally:
+        # Leave the underlying upload file open for its owner
+        text.detach()
+    
+    if not rows:
+        return pd.DataFrame(columns=header)
+    
+    return pd.DataFrame({
+        column: convert_csv_column(values)
+        for column, values in zip(header, zip(*rows))
+    })
+
+def read_large_csv(file) -> pd.DataFrame:
+    """Parse a CSV upload with pyarrow's multithreaded reader"""
+    read_options = pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+    arrow_table = pacsv.read_csv(
+        file,
+        read_options=read_options,
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True)
+    )
+    
+    # pyarrow infers timestamps, dates and times, which pandas and the small-file
+    # path keep as text; re-read those columns as strings so a column's output
+    # doesn't depend on the upload's size
+    temporal = [field.name for field in arrow_table.schema if pa.types.is_temporal(field.type)]
+    if temporal:
+        file.seek(0)
+        arrow_table = pacsv.read_csv(
+            file,
+            read_options=read_options,
+            convert_options=pacsv.ConvertOptions(
+                strings_can_be_null=True,
+                column_types=dict.fromkeys(temporal, pa.string())
+            )
+        )
+    
+    arrow_table = arrow_table.rename_columns(dedupe_csv_header(arrow_table.column_names))
+    # self_destruct frees each Arrow column as soon as it has been converted,
+    # so the file is never held in memory twice
+    return arrow_table.to_pandas(self_destruct=True, split_blocks=True)
+
+def csv_column_accepts(column: pd.Series, value: Any) -> bool:
+    """Whether a CSV column can store value without pandas changing its dtype"""
+    kind = column.dtype.kind
+    if kind in "iu":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if kind == "b":
+        return isinstance(value, bool)
+    if kind == "f":
+        return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+    return True
+
+def set_csv_record(table_name: str, record_id: int, record: Dict[str, Any]):
+    """Insert or replace a CSV record, adding columns for any new fields"""
+    table_info = csv_tables[table_name]
+    df = table_info["df"]
+    
+    for column in record:
+        if column not in df.columns:
+            df[column] = None
+    
+    # Int and bool columns can't hold a missing or differently typed value; pandas
+    # would upcast them (ints to float, bools to 1.0/0.0) and change how every other
+    # row serializes, so move just those columns to object first
+    for column in df.columns:
+        if not csv_column_accepts(df[column], record.get(column)):
+            df[column] = df[column].astype(object)
+    
+    # Build the row as object dtype: an all-numeric record would otherwise become a
+    # float64 Series and upcast the int columns of every row when the frame grows.
+    # Fields missing from the record are stored as NaN
+    df.loc[record_id] = pd.Series(record, dtype=object)
+    table_info["columns"] = df.columns.tolist()
+
+def stream_table_data(table_name: str, conn, result, limit: int, offset: int):
+    """Stream database rows as the JSON body returned by get_table_data"""
+    try:
+        yield b'{"table":' + orjson.dumps(table_name) + b',"data":['
+        
+        total = 0
+        for partition in result.mappings().partitions():
+            rows = b",".join(dump_json(dict(row)) for row in partition)
+            yield (b"," if total else b"") + rows
+            total += len(partition)
+        
+        yield b'],"total":%d,"limit":%d,"offset":%d,"source":"database"}' % (total, limit, offset)
+    finally:
+        result.close()
+        conn.close()
+
 def get_csv_record_by_id(table_name: str, record_id: int):
     """Get a specific CSV record by ID"""
     if table_name not in csv_tables:
         raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
     
-    for record in csv_tables[table_name]["data"]:
-        if record.get('id') == record_id:
-            return record
+    # Reads take the table lock too: pandas builds an Index's hash table lazily on
+    # first lookup, which isn't thread-safe, and every write leaves a fresh index
+    with csv_locks[table_name]:
+        df = csv_tables[table_name]["df"]
+        if record_id in df.index:
+            return df.loc[[record_id]].to_dict('records')[0]
     
     raise HTTPException(status_code=404, detail=f"Record with ID {record_id} not found")
 
@@ -132,11 +407,15 @@ async def root():
     }
 
 @app.post("/connect")
-async def connect_database(connection: DatabaseConnection):
+def connect_database(connection: DatabaseConnection, refresh: bool = False):
     """Connect to a database and generate APIs"""
     try:
         engine = get_db_engine(connection.db_url)
         
+        # Re-read table schemas if the database structure has changed
+        if refresh:
+            clear_table_cache(engine)
+        
         # Test connection
         with engine.connect() as conn:
             result = conn.execute(sa.text("SELECT 1"))
@@ -146,9 +425,7 @@ async def connect_database(connection: DatabaseConnection):
         if connection.table_name:
             tables = [connection.table_name]
         else:
-            metadata = MetaData()
-            metadata.reflect(bind=engine)
-            tables = list(metadata.tables.keys())
+            tables = list(get_database_metadata(engine).tables.keys())
         
         # Get detailed schema information
         table_schemas = []
@@ -175,7 +452,7 @@ async def connect_database(connection: DatabaseConnection):
         raise HTTPException(status_code=400, detail=f"Connection failed: {str(e)}")
 
 @app.post("/upload")
-async def upload_csv(
+def upload_csv(
     file: UploadFile = File(...),
     table_name: str = Form(...)
 ):
@@ -184,18 +461,21 @@ async def upload_csv(
         raise HTTPException(status_code=400, detail="File must be a CSV")
     
     try:
-        # Read CSV file
-        df = pd.read_csv(file.file)
-        data = df.to_dict('records')
+        # Small files skip pyarrow's thread pool and type inference setup;
+        # larger ones go through its multithreaded parser
+        if file.size is not None and file.size <= SMALL_CSV_SIZE:
+            df = read_small_csv(file.file)
+        else:
+            df = read_large_csv(file.file)
         
         # Create virtual table
-        table = create_csv_table(table_name, data)
+        table = create_csv_table(table_name, df)
         
         return {
             "status": "success",
             "table_name": table_name,
-            "rows": len(data),
-            "columns": list(data[0].keys()) if data else [],
+            "rows": csv_tables[table]["row_count"],
+            "columns": csv_tables[table]["columns"],
             "message": f"CSV uploaded and table '{table_name}' created successfully"
         }
     
@@ -203,7 +483,7 @@ async def upload_csv(
         raise HTTPException(status_code=400, detail=f"Upload failed: {str(e)}")
 
 @app.get("/tables")
-async def list_tables(db_url: str = None):
+def list_tables(db_url: str = None):
     """List all tables in the database and CSV tables"""
     tables = []
     
@@ -223,8 +503,7 @@ async def list_tables(db_url: str = None):
     if effective_db_url:
         try:
             engine = get_db_engine(effective_db_url)
-            metadata = MetaData()
-            metadata.reflect(bind=engine)
+            metadata = get_database_metadata(engine)
             
             for table_name, table in metadata.tables.items():
                 columns = [{"name": col.name, "type": str(col.type)} for col in table.columns]
@@ -239,7 +518,7 @@ async def list_tables(db_url: str = None):
     return {"tables": tables}
 
 @app.get("/api/{table_name}")
-async def get_table_data(
+def get_table_data(
     table_name: str,
     db_url: str = None,
     limit: int = 100,
@@ -249,18 +528,19 @@ async def get_table_data(
     try:
         # Check if it's a CSV table first
         if table_name in csv_tables:
-            csv_data = csv_tables[table_name]["data"]
-            total_rows = len(csv_data)
-            rows = csv_data[offset:offset + limit]
+            with csv_locks[table_name]:
+                df = csv_tables[table_name]["df"]
+                total_rows = len(df)
+                rows = df.iloc[offset:offset + limit].to_dict('records')
             
-            return {
+            return APIResponse({
                 "table": table_name,
                 "data": rows,
                 "total": total_rows,
                 "limit": limit,
                 "offset": offset,
                 "source": "csv"
-            }
+            })
         
         # Otherwise, try database table
         effective_db_url = db_url or default_db_url
@@ -270,25 +550,26 @@ async def get_table_data(
         engine = get_db_engine(effective_db_url)
         table = get_table_schema(engine, table_name)
         
-        with engine.connect() as conn:
+        # Stream rows from a server-side cursor instead of buffering the whole page;
+        # the connection is closed once the response body has been sent
+        conn = engine.connect()
+        try:
             query = sa.select(table).limit(limit).offset(offset)
-            result = conn.execute(query)
-            rows = [dict(row._mapping) for row in result]
+            result = conn.execution_options(stream_results=True, yield_per=DB_STREAM_BATCH_SIZE).execute(query)
+        except Exception:
+            conn.close()
+            raise
         
-        return {
-            "table": table_name,
-            "data": rows,
-            "total": len(rows),
-            "limit": limit,
-            "offset": offset,
-            "source": "database"
-        }
+        return StreamingResponse(
+            stream_table_data(table_name, conn, result, limit, offset),
+            media_type="application/json"
+        )
     
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to get data: {str(e)}")
 
 @app.get("/api/{table_name}/{record_id}")
-async def get_record(
+def get_record(
     table_name: str,
     record_id: int,
     db_url: str = None
@@ -298,7 +579,7 @@ async def get_record(
         # Check if it's a CSV table first
         if table_name in csv_tables:
             record = get_csv_record_by_id(table_name, record_id)
-            return {"record": record, "source": "csv"}
+            return APIResponse({"record": record, "source": "csv"})
         
         # Otherwise, try database table
         effective_db_url = db_url or default_db_url
@@ -309,20 +590,20 @@ async def get_record(
         table = get_table_schema(engine, table_name)
         
         with engine.connect() as conn:
-            query = sa.select(table).where(table.c.id == record_id)
-            result = conn.execute(query)
-            row = result.fetchone()
+            query = get_table_statements(table)["get_by_id"]
+            result = conn.execute(query, {"_record_id": record_id})
+            row = result.mappings().first()
             
             if not row:
                 raise HTTPException(status_code=404, detail="Record not found")
             
-            return {"record": dict(row._mapping), "source": "database"}
+            return APIResponse({"record": dict(row), "source": "database"})
     
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to get record: {str(e)}")
 
 @app.post("/api/{table_name}")
-async def create_record(
+def create_record(
     table_name: str,
     record_data: RecordData,
     db_url: str = None
@@ -332,10 +613,13 @@ async def create_record(
         # Check if it's a CSV table first
         if table_name in csv_tables:
             new_record = record_data.data.copy()
-            new_record['id'] = csv_next_ids[table_name]
-            csv_tables[table_name]["data"].append(new_record)
-            csv_tables[table_name]["row_count"] += 1
-            csv_next_ids[table_name] += 1
+            with csv_locks[table_name]:
+                new_record['id'] = csv_next_ids[table_name]
+                if new_record['id'] in csv_tables[table_name]["df"].index:
+                    raise ValueError(f"Record with ID {new_record['id']} already exists")
+                csv_next_ids[table_name] = new_record['id'] + 1
+                set_csv_record(table_name, new_record['id'], new_record)
+                csv_tables[table_name]["row_count"] += 1
             
             return {
                 "status": "created",
@@ -352,9 +636,11 @@ async def create_record(
         engine = get_db_engine(effective_db_url)
         table = get_table_schema(engine, table_name)
         
+        check_record_columns(table, record_data.data)
+        
         with engine.connect() as conn:
-            query = table.insert().values(**record_data.data)
-            result = conn.execute(query)
+            query = get_table_statements(table)["insert"]
+            result = conn.execute(query, record_data.data)
             conn.commit()
             
             return {
@@ -368,7 +654,7 @@ async def create_record(
         raise HTTPException(status_code=400, detail=f"Failed to create record: {str(e)}")
 
 @app.put("/api/{table_name}/{record_id}")
-async def update_record(
+def update_record(
     table_name: str,
     record_id: int,
     record_data: RecordData,
@@ -378,20 +664,21 @@ async def update_record(
     try:
         # Check if it's a CSV table first
         if table_name in csv_tables:
-            for i, record in enumerate(csv_tables[table_name]["data"]):
-                if record.get('id') == record_id:
-                    # Preserve the ID
-                    updated_record = record_data.data.copy()
-                    updated_record['id'] = record_id
-                    csv_tables[table_name]["data"][i] = updated_record
-                    
-                    return {
-                        "status": "updated",
-                        "message": "Record updated successfully",
-                        "source": "csv"
-                    }
+            # Preserve the ID
+            updated_record = record_data.data.copy()
+            updated_record['id'] = record_id
             
-            raise HTTPException(status_code=404, detail="Record not found")
+            with csv_locks[table_name]:
+                if record_id not in csv_tables[table_name]["df"].index:
+                    raise HTTPException(status_code=404, detail="Record not found")
+                
+                set_csv_record(table_name, record_id, updated_record)
+            
+            return {
+                "status": "updated",
+                "message": "Record updated successfully",
+                "source": "csv"
+            }
         
         # Otherwise, try database table
         effective_db_url = db_url or default_db_url
@@ -401,9 +688,13 @@ async def update_record(
         engine = get_db_engine(effective_db_url)
         table = get_table_schema(engine, table_name)
         
+        check_record_columns(table, record_data.data)
+        if not record_data.data:
+            raise ValueError("No fields to update")
+        
         with engine.connect() as conn:
-            query = table.update().where(table.c.id == record_id).values(**record_data.data)
-            result = conn.execute(query)
+            query = get_table_statements(table)["update"]
+            result = conn.execute(query, {**record_data.data, "_record_id": record_id})
             conn.commit()
             
             if result.rowcount == 0:
@@ -419,7 +710,7 @@ async def update_record(
         raise HTTPException(status_code=400, detail=f"Failed to update record: {str(e)}")
 
 @app.delete("/api/{table_name}/{record_id}")
-async def delete_record(
+def delete_record(
     table_name: str,
     record_id: int,
     db_url: str = None
@@ -428,18 +719,19 @@ async def delete_record(
     try:
         # Check if it's a CSV table first
         if table_name in csv_tables:
-            for i, record in enumerate(csv_tables[table_name]["data"]):
-                if record.get('id') == record_id:
-                    del csv_tables[table_name]["data"][i]
-                    csv_tables[table_name]["row_count"] -= 1
-                    
-                    return {
-                        "status": "deleted",
-                        "message": "Record deleted successfully",
-                        "source": "csv"
-                    }
+            with csv_locks[table_name]:
+                df = csv_tables[table_name]["df"]
+                if record_id not in df.index:
+                    raise HTTPException(status_code=404, detail="Record not found")
+                
+                df.drop(record_id, inplace=True)
+                csv_tables[table_name]["row_count"] -= 1
             
-            raise HTTPException(status_code=404, detail="Record not found")
+            return {
+                "status": "deleted",
+                "message": "Record deleted successfully",
+                "source": "csv"
+            }
         
         # Otherwise, try database table
         effective_db_url = db_url or default_db_url
@@ -450,8 +742,8 @@ async def delete_record(
         table = get_table_schema(engine, table_name)
         
         with engine.connect() as conn:
-            query = table.delete().where(table.c.id == record_id)
-            result = conn.execute(query)
+            query = get_table_statements(table)["delete"]
+            result = conn.execute(query, {"_record_id": record_id})
             conn.commit()
             
             if result.rowcount == 0:
@@ -498,4 +790,5 @@ app.include_router(graphql_app, prefix="/graphql")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Single worker: uploaded CSV tables live in this process's memory
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
@@ -0,0 +1,87 @@
+"""Tests for CSV-backed virtual tables"""
+
+import io
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.main import app, create_record, get_record, RecordData
+
+client = TestClient(app)
+
+def upload(table_name, content):
+    """Upload CSV content as a virtual table"""
+    response = client.post(
+        "/upload",
+        files={"file": ("data.csv", io.BytesIO(content), "text/csv")},
+        data={"table_name": table_name},
+    )
+    assert response.status_code == 200, response.text
+    return response
+
+class CSVRecordTypesTest(unittest.TestCase):
+    def test_numeric_create_keeps_int_columns(self):
+        """An all-numeric record must not upcast the table's int columns to float"""
+        upload("numeric_create", b"qty,price\n1,2.5\n3,4.0\n")
+
+        response = client.post("/api/numeric_create", json={"data": {"qty": 5, "price": 1.25}})
+        self.assertEqual(response.status_code, 200, response.text)
+
+        records = client.get("/api/numeric_create").json()["data"]
+        self.assertEqual([record["id"] for record in records], [1, 2, 3])
+        self.assertEqual([record["qty"] for record in records], [1, 3, 5])
+        for record in records:
+            self.assertIs(type(record["id"]), int)
+            self.assertIs(type(record["qty"]), int)
+
+    def test_numeric_update_keeps_int_columns(self):
+        """Replacing a row with numeric values must not upcast the other rows"""
+        upload("numeric_update", b"qty,price\n1,2.5\n3,4.0\n")
+
+        response = client.put("/api/numeric_update/1", json={"data": {"qty": 7, "price": 1.5}})
+        self.assertEqual(response.status_code, 200, response.text)
+
+        records = client.get("/api/numeric_update").json()["data"]
+        self.assertEqual(records, [
+            {"id": 1, "qty": 7, "price": 1.5},
+            {"id": 2, "qty": 3, "price": 4.0},
+        ])
+        self.assertIs(type(client.get("/api/numeric_update/2").json()["record"]["id"]), int)
+
+class CSVParserConsistencyTest(unittest.TestCase):
+    CONTENT = (
+        b"name,qty,price,active,ts,day,at,iso\n"
+        b"ann,1,2.5,true,2024-01-02 10:00:00,2024-01-02,10:00:00,2024-01-02T10:00:00Z\n"
+        b"bob,,NA,False,2024-02-03 11:30:00,,11:30:00,2024-02-03T11:30:00.5\n"
+        b"NULL,3,4.0,TRUE,,2024-03-04,,\n"
+    )
+
+    def test_small_and_large_paths_serve_same_records(self):
+        """A CSV's records must not depend on which parser its size selects"""
+        upload("parsed_small", self.CONTENT)
+        with mock.patch("app.main.SMALL_CSV_SIZE", 0):
+            upload("parsed_large", self.CONTENT)
+
+        small = client.get("/api/parsed_small").json()["data"]
+        large = client.get("/api/parsed_large").json()["data"]
+        self.assertEqual(small, large)
+        self.assertEqual(small[0]["ts"], "2024-01-02 10:00:00")
+        self.assertEqual(small[0]["iso"], "2024-01-02T10:00:00Z")
+
+class CSVConcurrencyTest(unittest.TestCase):
+    def test_concurrent_reads_after_write_find_record(self):
+        """Concurrent lookups right after a write must all find an existing record"""
+        upload("concurrent_reads", b"name\nann\n")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for _ in range(20):
+                # Each write leaves a fresh index whose lookup table is built on first use
+                create_record("concurrent_reads", RecordData(data={"name": "bob"}))
+                responses = list(pool.map(lambda _: get_record("concurrent_reads", 1), range(8)))
+                for response in responses:
+                    self.assertEqual(response.status_code, 200, response.body)
+
+if __name__ == "__main__":
+    unittest.main()
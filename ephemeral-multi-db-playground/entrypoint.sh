@@ -7,6 +7,7 @@ TTL=${TTL:-86400}
 DB_NAME=${DB_NAME:-testdb}
 DB_USER=${DB_USER:-testuser}
 DB_PASSWORD=${DB_PASSWORD:-testpass}
+API_WORKERS=${API_WORKERS:-2}
 
 # Detect if we're running in slim mode (baked-in database type)
 # Check which database servers are available
@@ -104,8 +105,8 @@ seed_database() {
 
 # Function to start API server
 start_api() {
-    echo "Starting API server..."
-    python /app/app/main.py &
+    echo "Starting API server with $API_WORKERS workers..."
+    gunicorn --workers "$API_WORKERS" --bind 0.0.0.0:8080 --preload --chdir /app/app main:app &
     API_PID=$!
     echo "API server started with PID: $API_PID"
 }
@@ -1,9 +1,10 @@
 import os
 import sqlite3
+import numpy as np
 import pymysql
 import psycopg2
+from psycopg2.extras import execute_values
 from datetime import datetime, timedelta
-import random
 
 # Environment variables
 DB_TYPE = os.getenv('DB_TYPE', 'mysql')
@@ -11,6 +12,9 @@ DB_NAME = os.getenv('DB_NAME', 'testdb')
 DB_USER = os.getenv('DB_USER', 'testuser')
 DB_PASSWORD = os.getenv('DB_PASSWORD', 'testpass')
 
+# Random generator for sample data
+rng = np.random.default_rng()
+
 def get_connection():
     """Get database connection based on type"""
     if DB_TYPE == 'mysql':
@@ -41,6 +45,36 @@ def get_placeholder():
     else:
         return '%s'
 
+def insert_rows(cursor, table, columns, rows, return_ids=False):
+    """Insert all rows into a table with a single batched statement, skipping duplicates.
+    
+    With return_ids, returns the ids given to the new rows. This is only valid for
+    tables without unique constraints, where every row is inserted.
+    """
+    column_list = ', '.join(columns)
+    if DB_TYPE == 'postgresql':
+        sql = f'INSERT INTO {table} ({column_list}) VALUES %s ON CONFLICT DO NOTHING'
+        if return_ids:
+            inserted = execute_values(cursor, sql + ' RETURNING id', rows, page_size=len(rows), fetch=True)
+            return [row[0] for row in inserted]
+        execute_values(cursor, sql, rows, page_size=500)
+        return None
+    
+    insert = 'INSERT OR IGNORE' if DB_TYPE == 'sqlite' else 'INSERT IGNORE'
+    placeholders = ', '.join([get_placeholder()] * len(columns))
+    cursor.executemany(f'{insert} INTO {table} ({column_list}) VALUES ({placeholders})', rows)
+    if not return_ids:
+        return None
+    
+    if DB_TYPE == 'mysql':
+        # A multi-row INSERT reports the id of its first row; the rest follow consecutively
+        first_id = cursor.lastrowid
+    else:
+        # SQLite runs in-process, so asking for the last id is not a network round trip
+        cursor.execute('SELECT last_insert_rowid()')
+        first_id = cursor.fetchone()[0] - len(rows) + 1
+    return list(range(first_id, first_id + len(rows)))
+
 def create_tables(conn):
     """Create sample tables"""
     cursor = conn.cursor()
@@ -124,9 +158,8 @@ def create_tables(conn):
     conn.commit()
 
 def seed_users(conn):
-    """Seed users table with sample data"""
+    """Seed users table with sample data; returns ids 1-10, assuming users were first seeded into an empty table"""
     cursor = conn.cursor()
-    placeholder = get_placeholder()
     
     users = [
         ('john_doe', 'john@example.com', 'admin'),
@@ -137,28 +170,23 @@ def seed_users(conn):
     ]
     
     # Add more random users
-    for i in range(45):
-        username = f'user_{i+6}'
-        email = f'user{i+6}@example.com'
-        role = random.choice(['user', 'moderator', 'admin'])
-        users.append((username, email, role))
+    numbers = range(6, 51)
+    roles = rng.choice(['user', 'moderator', 'admin'], size=len(numbers))
+    users.extend(zip(
+        [f'user_{i}' for i in numbers],
+        [f'user{i}@example.com' for i in numbers],
+        roles.tolist()
+    ))
     
-    for user in users:
-        try:
-            cursor.execute(
-                f'INSERT INTO users (username, email, role) VALUES ({placeholder}, {placeholder}, {placeholder})',
-                user
-            )
-        except:
-            # Ignore duplicate key errors
-            pass
+    insert_rows(cursor, 'users', ('username', 'email', 'role'), users)
     
-    conn.commit()
+    # The sample users are fixed, so the first seed of the fresh database gives them
+    # ids 1..len(users) in list order and later reseeds skip them as duplicates
+    return list(range(1, 11))
 
 def seed_products(conn):
-    """Seed products table with sample data"""
+    """Seed products table with sample data, returning (id, price) for the first twenty"""
     cursor = conn.cursor()
-    placeholder = get_placeholder()
     
     categories = ['Electronics', 'Clothing', 'Books', 'Home & Garden', 'Sports']
     products = [
@@ -171,60 +199,40 @@ def seed_products(conn):
     ]
     
     # Add more random products
-    for i in range(94):
-        name = f'Product {i+7}'
-        category = random.choice(categories)
-        price = round(random.uniform(10.0, 1000.0), 2)
-        stock = random.randint(10, 200)
-        products.append((name, category, price, stock))
+    numbers = range(7, 101)
+    count = len(numbers)
+    products.extend(zip(
+        [f'Product {i}' for i in numbers],
+        rng.choice(categories, size=count).tolist(),
+        rng.uniform(10.0, 1000.0, size=count).round(2).tolist(),
+        rng.integers(10, 200, size=count, endpoint=True).tolist()
+    ))
     
-    for product in products:
-        try:
-            cursor.execute(
-                f'INSERT INTO products (name, category, price, stock) VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder})',
-                product
-            )
-        except:
-            # Ignore duplicate key errors
-            pass
+    product_ids = insert_rows(cursor, 'products', ('name', 'category', 'price', 'stock'), products, return_ids=True)
     
-    conn.commit()
+    return [(product_id, product[2]) for product_id, product in zip(product_ids, products)][:20]
 
-def seed_orders(conn):
-    """Seed orders table with sample data"""
+def seed_orders(conn, user_ids, product_data):
+    """Seed orders table with sample data for the given users and (id, price) products"""
     cursor = conn.cursor()
-    placeholder = get_placeholder()
     
     statuses = ['pending', 'processing', 'shipped', 'delivered', 'cancelled']
     
-    # Get user and product IDs
-    cursor.execute('SELECT id FROM users LIMIT 10')
-    user_ids = [row[0] for row in cursor.fetchall()]
+    count = 200
+    product_ids = np.array([row[0] for row in product_data])
+    prices = np.array([row[1] for row in product_data])
+    picks = rng.integers(len(product_data), size=count)
+    quantities = rng.integers(1, 5, size=count, endpoint=True)
     
-    cursor.execute('SELECT id, price FROM products LIMIT 20')
-    product_data = cursor.fetchall()
-    
-    orders = []
-    for i in range(200):
-        user_id = random.choice(user_ids)
-        product_id, price = random.choice(product_data)
-        quantity = random.randint(1, 5)
-        status = random.choice(statuses)
-        total_amount = price * quantity
-        
-        orders.append((user_id, product_id, quantity, status, total_amount))
+    orders = list(zip(
+        rng.choice(user_ids, size=count).tolist(),
+        product_ids[picks].tolist(),
+        quantities.tolist(),
+        rng.choice(statuses, size=count).tolist(),
+        (prices[picks] * quantities).round(2).tolist()
+    ))
     
-    for order in orders:
-        try:
-            cursor.execute(
-                f'INSERT INTO orders (user_id, product_id, quantity, status, total_amount) VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder}, {placeholder})',
-                order
-            )
-        except:
-            # Ignore duplicate key errors
-            pass
-    
-    conn.commit()
+    insert_rows(cursor, 'orders', ('user_id', 'product_id', 'quantity', 'status', 'total_amount'), orders)
 
 def seed_database():
     """Main function to seed the database"""
@@ -261,18 +269,21 @@ def seed_database():
         print("Tables created successfully")
         
         # Seed data
-        seed_users(conn)
+        user_ids = seed_users(conn)
         print("Users seeded successfully")
         
-        seed_products(conn)
+        product_data = seed_products(conn)
         print("Products seeded successfully")
         
-        seed_orders(conn)
+        seed_orders(conn, user_ids, product_data)
         print("Orders seeded successfully")
         
+        # Commit all seed data in a single transaction
+        conn.commit()
         print(f"Database seeding completed for {DB_TYPE}")
         
     except Exception as e:
+        conn.rollback()
         print(f"Error seeding database: {e}")
         raise
     finally:
@@ -4,17 +4,28 @@ Sample metrics generator for QuestDB
 Generates realistic system and application metrics
 """
 
+import gzip
 import time
 import random
+import itertools
+import numpy as np
 import requests
 import os
+import socket
 import sys
-from datetime import datetime, timedelta
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 # Configuration
 QUESTDB_URL = "http://localhost:9000"
+EXEC_URL = f"{QUESTDB_URL}/exec"
+WRITE_URL = f"{QUESTDB_URL}/write"
+WRITE_HEADERS = {'Content-Type': 'text/plain', 'Connection': 'keep-alive'}
+GZIP_WRITE_HEADERS = {**WRITE_HEADERS, 'Content-Encoding': 'gzip'}
+QUESTDB_HTTP_ADDRESS = ("localhost", 9000)
+QUESTDB_ILP_ADDRESS = ("localhost", 9009)
+ILP_TRANSPORT = os.getenv('ILP_TRANSPORT', 'tcp').lower()  # 'tcp' or 'http'
+ILP_HTTP_GZIP = os.getenv('ILP_HTTP_GZIP', 'false').lower() == 'true'
 SAMPLE_INTERVAL = int(os.getenv('SAMPLE_INTERVAL', '15'))  # seconds
 ENABLE_SAMPLE_METRICS = os.getenv('SAMPLE_METRICS', 'true').lower() == 'true'
 
@@ -33,6 +44,8 @@ ENDPOINTS = [
     "/inventory",
 ]
 
+rng = np.random.default_rng()
+
 # Create a session with connection pooling
 session = requests.Session()
 retry_strategy = Retry(
@@ -44,20 +57,27 @@ adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxs
 session.mount("http://", adapter)
 session.mount("https://", adapter)
 
+# Persistent ILP/TCP connection, opened on first write
+ilp_socket = None
+
 def wait_for_questdb():
-    """Wait for QuestDB to be ready"""
+    """Wait for QuestDB to be ready, backing off exponentially between probes"""
     max_retries = 30
+    delay = 0.1
     for attempt in range(max_retries):
+        # A bare TCP connect is a cheap probe until the HTTP port is listening
         try:
-            response = session.get(f"{QUESTDB_URL}/exec?query=SELECT%201", timeout=5)
+            socket.create_connection(QUESTDB_HTTP_ADDRESS, timeout=1).close()
+            response = session.get(EXEC_URL, params={"query": "SELECT 1"}, timeout=5)
             if response.status_code == 200:
                 print("QuestDB is ready")
                 return True
-        except requests.exceptions.RequestException:
+        except (OSError, requests.exceptions.RequestException):
             pass
         
         print(f"Waiting for QuestDB... ({attempt + 1}/{max_retries})")
-        time.sleep(2)
+        time.sleep(delay)
+        delay = min(delay * 1.5, 2.0)
     
     print("QuestDB not available, skipping sample metrics")
     return False
@@ -74,107 +94,114 @@ def create_tables():
     
     for table_sql in tables:
         try:
-            response = session.get(f"{QUESTDB_URL}/exec?query={table_sql}")
+            response = session.get(EXEC_URL, params={"query": table_sql}, timeout=10)
             if response.status_code == 200:
                 print(f"Created table: {table_sql.split('(')[0].split()[-1]}")
         except Exception as e:
             print(f"Error creating table: {e}")
 
-def generate_cpu_metrics():
-    """Generate CPU usage metrics"""
-    hosts = HOSTS
-    base_usage = random.uniform(20, 40)
-    variation = random.uniform(-10, 10)
-    usage = max(0, min(100, base_usage + variation))
-    
-    for host in hosts:
-        host_usage = max(0, min(100, usage + random.uniform(-5, 5)))
-        timestamp = time.time_ns()
-        data = f"cpu_usage,host={host} value={host_usage:.2f} {timestamp}"
-        
-        try:
-            response = session.post(f"{QUESTDB_URL}/write", data=data, headers={'Content-Type': 'text/plain'}, timeout=5)
-            if response.status_code != 204:
-                print(f"Error writing CPU metrics: {response.status_code}")
-        except Exception as e:
-            print(f"Error writing CPU metrics: {e}")
-
-def generate_memory_metrics():
-    """Generate memory usage metrics"""
-    hosts = HOSTS
-    base_usage = random.uniform(50, 80)
-    variation = random.uniform(-15, 15)
-    usage = max(0, min(100, base_usage + variation))
-    
-    for host in hosts:
-        host_usage = max(0, min(100, usage + random.uniform(-10, 10)))
-        timestamp = time.time_ns()
-        data = f"memory_usage,host={host} value={host_usage:.2f} {timestamp}"
-        
+def send_ilp_tcp(payload):
+    """Send an ILP payload over the persistent TCP connection, reconnecting once if it dropped"""
+    global ilp_socket
+    for attempt in range(2):
         try:
-            response = session.post(f"{QUESTDB_URL}/write", data=data, headers={'Content-Type': 'text/plain'}, timeout=5)
+            if ilp_socket is None:
+                ilp_socket = socket.create_connection(QUESTDB_ILP_ADDRESS, timeout=10)
+            ilp_socket.sendall(payload)
+            return
+        except OSError:
+            if ilp_socket is not None:
+                ilp_socket.close()
+                ilp_socket = None
+            if attempt:
+                raise
+
+def record_error(errors, message):
+    """Count an error towards the current tick's summary"""
+    errors[message] = errors.get(message, 0) + 1
+
+def write_metrics(payload, errors):
+    """Write an ILP payload to QuestDB in a single batch, recording failures in errors"""
+    try:
+        if ILP_TRANSPORT == 'http':
+            headers = WRITE_HEADERS
+            if ILP_HTTP_GZIP:
+                # Level 1: the batch is repetitive enough that higher levels gain little
+                payload = gzip.compress(payload, compresslevel=1)
+                headers = GZIP_WRITE_HEADERS
+            response = session.post(WRITE_URL, data=payload, headers=headers, timeout=10, allow_redirects=False)
             if response.status_code != 204:
-                print(f"Error writing memory metrics: {response.status_code}")
-        except Exception as e:
-            print(f"Error writing memory metrics: {e}")
+                record_error(errors, f"Error writing metrics: {response.status_code}")
+        else:
+            send_ilp_tcp(payload)
+    except Exception as e:
+        record_error(errors, f"Error writing metrics: {e}")
 
-def generate_disk_metrics():
-    """Generate disk usage metrics"""
-    hosts = HOSTS
-    devices = DEVICES
-    base_usage = random.uniform(30, 70)
-    
-    for host in hosts:
-        for device in devices:
-            usage = max(0, min(100, base_usage + random.uniform(-20, 20)))
-            timestamp = time.time_ns()
-            data = f"disk_usage,host={host},device={device} value={usage:.2f} {timestamp}"
-            
-            try:
-                response = session.post(f"{QUESTDB_URL}/write", data=data, headers={'Content-Type': 'text/plain'}, timeout=5)
-                if response.status_code != 204:
-                    print(f"Error writing disk metrics: {response.status_code}")
-            except Exception as e:
-                print(f"Error writing disk metrics: {e}")
+def fill_template(template, ts, *columns):
+    """Format a payload template in one pass, one row per series from columns, stamped with ts"""
+    width = len(columns) + 1
+    args = [ts] * (width * len(columns[0]))
+    for i, column in enumerate(columns):
+        args[i::width] = column
+    return template % tuple(args)
 
-def generate_network_metrics():
-    """Generate network traffic metrics"""
-    hosts = HOSTS
-    interfaces = INTERFACES
-    
-    for host in hosts:
-        for interface in interfaces:
-            bytes_in = random.uniform(1000, 10000)
-            bytes_out = random.uniform(500, 5000)
-            timestamp = time.time_ns()
-            data = f"network_traffic,host={host},interface={interface} bytes_in={bytes_in:.2f},bytes_out={bytes_out:.2f} {timestamp}"
-            
-            try:
-                response = session.post(f"{QUESTDB_URL}/write", data=data, headers={'Content-Type': 'text/plain'}, timeout=5)
-                if response.status_code != 204:
-                    print(f"Error writing network metrics: {response.status_code}")
-            except Exception as e:
-                print(f"Error writing network metrics: {e}")
+def percent_field(low, high, tick_jitter, series_jitter):
+    """Field drawer for a 0-100 usage level shared per tick, with per-series jitter"""
+    def draw(count):
+        level = rng.uniform(low, high) + rng.uniform(-tick_jitter, tick_jitter)
+        return np.clip(level + rng.uniform(-series_jitter, series_jitter, size=count), 0, 100).tolist()
+    return draw
 
-def generate_application_metrics():
-    """Generate application performance metrics"""
-    services = SERVICES
-    endpoints = ENDPOINTS
-    status_codes = [200, 200, 200, 200, 404, 500]  # Mostly successful, some errors
-    
-    for service in services:
-        for endpoint in endpoints:
-            response_time = random.uniform(10, 500)
-            status_code = random.choice(status_codes)
-            timestamp = time.time_ns()
-            data = f"application_metrics,service={service},endpoint={endpoint} response_time={response_time:.2f},status_code={status_code} {timestamp}"
-            
-            try:
-                response = session.post(f"{QUESTDB_URL}/write", data=data, headers={'Content-Type': 'text/plain'}, timeout=5)
-                if response.status_code != 204:
-                    print(f"Error writing application metrics: {response.status_code}")
-            except Exception as e:
-                print(f"Error writing application metrics: {e}")
+def uniform_field(low, high):
+    """Field drawer for independent uniform values per series"""
+    def draw(count):
+        return rng.uniform(low, high, size=count).tolist()
+    return draw
+
+def choice_field(population, cum_weights):
+    """Field drawer picking each series' value from a weighted population"""
+    def draw(count):
+        return random.choices(population, cum_weights=cum_weights, k=count)
+    return draw
+
+# Mostly successful, some errors: 200 4/6, 404 1/6, 500 1/6
+STATUS_POP = (200, 404, 500)
+STATUS_CUM = (4, 5, 6)
+
+# Sample measurements: (measurement, [(tag, values)], [(field, format, drawer)])
+# Every combination of tag values is one series.
+METRICS = [
+    ("cpu_usage", [("host", HOSTS)], [("value", "%.2f", percent_field(20, 40, 10, 5))]),
+    ("memory_usage", [("host", HOSTS)], [("value", "%.2f", percent_field(50, 80, 15, 10))]),
+    ("disk_usage", [("host", HOSTS), ("device", DEVICES)], [("value", "%.2f", percent_field(30, 70, 0, 20))]),
+    ("network_traffic", [("host", HOSTS), ("interface", INTERFACES)], [
+        ("bytes_in", "%.2f", uniform_field(1000, 10000)),
+        ("bytes_out", "%.2f", uniform_field(500, 5000)),
+    ]),
+    ("application_metrics", [("service", SERVICES), ("endpoint", ENDPOINTS)], [
+        ("response_time", "%.2f", uniform_field(10, 500)),
+        ("status_code", "%di", choice_field(STATUS_POP, STATUS_CUM)),
+    ]),
+]
+
+def build_template(measurement, tags, fields):
+    """Build the ILP payload template for a measurement, one line per series"""
+    field_set = ",".join(f"{name}={fmt}" for name, fmt, _ in fields)
+    lines = []
+    for values in itertools.product(*(tag_values for _, tag_values in tags)):
+        tag_set = ",".join(f"{name}={value}" for (name, _), value in zip(tags, values))
+        lines.append(f"{measurement},{tag_set} {field_set} %s\n")
+    return "".join(lines).encode(), len(lines), [draw for _, _, draw in fields]
+
+# (template, series count, field drawers) per measurement, built once at import
+METRIC_TEMPLATES = [build_template(*metric) for metric in METRICS]
+
+def generate_metrics(ts):
+    """Generate every sample measurement as one ILP payload stamped with ts"""
+    return b"".join(
+        fill_template(template, ts, *(draw(count) for draw in drawers))
+        for template, count, drawers in METRIC_TEMPLATES
+    )
 
 def main():
     """Main function to generate sample metrics"""
@@ -191,24 +218,35 @@ def main():
     # Create tables
     create_tables()
     
-    # Generate metrics continuously
-    while True:
-        try:
-            generate_cpu_metrics()
-            generate_memory_metrics()
-            generate_disk_metrics()
-            generate_network_metrics()
-            generate_application_metrics()
+    # Generate metrics continuously on a fixed cadence, so the time spent
+    # generating and writing doesn't stretch the interval
+    next_wake = time.monotonic()
+    try:
+        while True:
+            # Errors are counted and reported in the tick's single log line, so
+            # a misbehaving QuestDB can't flood stdout
+            errors = {}
+            try:
+                ts = b"%d" % time.time_ns()
+                write_metrics(generate_metrics(ts), errors)
+            except Exception as e:
+                record_error(errors, f"Error generating metrics: {e}")
             
-            print(f"Generated metrics at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            time.sleep(SAMPLE_INTERVAL)
+            summary = f"Generated metrics at {time.strftime('%Y-%m-%d %H:%M:%S')}"
+            if errors:
+                summary += f", errors this tick: {errors}"
+            sys.stdout.write(summary + "\n")
+            sys.stdout.flush()
             
-        except KeyboardInterrupt:
-            print("Stopping sample metrics generator...")
-            break
-        except Exception as e:
-            print(f"Error generating metrics: {e}")
-            time.sleep(SAMPLE_INTERVAL)
+            next_wake += SAMPLE_INTERVAL
+            delay = next_wake - time.monotonic()
+            if delay < 0:
+                print(f"Tick overran the {SAMPLE_INTERVAL}s interval by {-delay:.2f}s")
+                next_wake = time.monotonic()
+            else:
+                time.sleep(delay)
+    except KeyboardInterrupt:
+        print("Stopping sample metrics generator...")
 
 if __name__ == "__main__":
     main()